@@ -33,7 +33,6 @@ user-provided annotation timestamps.
 import json
 import logging
 import os
-import platform
 import sys
 
 from prometheus_client import Gauge
@@ -77,7 +76,7 @@ class RMSJob(Collector):
                 logging.error("")
                 sys.exit(4)
             # command-line flags for use with squeue to obtained desired metrics
-            hostname = platform.node().split(".", 1)[0]
+            hostname = utils.getShortHostname()
             flags = "-w " + hostname + " -h  --Format=JobID::,UserName::,Partition::,NumNodes::,BatchFlag"
             # cache query command with options
             self.__squeue_query = [command] + flags.split()
@@ -41,14 +41,15 @@ rocm_vram_used_percentage{card="0"} 0.0198
 rocm_utilization_percentage{card="0"} 0.0
 """
 
+import concurrent.futures
 import ctypes
 import logging
 import os
 import sys
+import time
 from enum import IntEnum
-from pathlib import Path
 
-from prometheus_client import CollectorRegistry, Gauge, generate_latest
+from prometheus_client import Gauge
 
 from omnistat.collector_base import Collector
 from omnistat.utils import (
@@ -185,8 +186,13 @@ class ROCMSMI(Collector):
         self.__minROCmVersion = "6.1.0"
         self.__ecc_ras_monitoring = runtimeConfig["collector_ras_ecc"]
         self.__power_cap_monitoring = runtimeConfig["collector_power_capping"]
+        self.__power_cap_dynamic = runtimeConfig["collector_power_cap_dynamic"]
         self.__cu_occupancy_monitoring = runtimeConfig["collector_cu_occupancy"]
+        self.__minSampleIntervalNs = runtimeConfig["collector_smi_min_sample_interval_ms"] * 1000000
+        self.__lastSampleNs = -self.__minSampleIntervalNs
+        self.__numCachedSamples = 0
         self.__eccBlocks = {}
+        self.__executor = None
 
         rocm_path = runtimeConfig["collector_rocm_path"]
 
@@ -256,6 +262,10 @@ class ROCMSMI(Collector):
         numGPUs_metric.set(numDevices.value)
         self.__num_gpus = numDevices.value
 
+        # thread pool used to query multiple devices concurrently
+        if self.__num_gpus > 1:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.__num_gpus)
+
         # determine GPU index mapping (ie. map kfd indices used by SMI lib to that of HIP_VISIBLE_DEVICES)
         guidMapping = {}
         nodeMapping = {}
@@ -335,7 +345,7 @@ class ROCMSMI(Collector):
                 continue
 
         self.registerGPUMetric(
-            self.__prefix + "temperature_celsius",
+            "temperature_celsius",
             "gauge",
             "Temperature (C)",
             labelExtra=["location"],
@@ -343,25 +353,32 @@ class ROCMSMI(Collector):
 
         if self.__temp_memory_location_index:
             self.registerGPUMetric(
-                self.__prefix + "temperature_memory_celsius",
+                "temperature_memory_celsius",
                 "gauge",
                 "Memory Temperature (C)",
                 labelExtra=["location"],
             )
 
         # power
-        self.registerGPUMetric(
-            self.__prefix + "average_socket_power_watts", "gauge", "Average Graphics Package Power (W)"
-        )
+        self.registerGPUMetric("average_socket_power_watts", "gauge", "Average Graphics Package Power (W)")
         # clock speeds
-        self.registerGPUMetric(self.__prefix + "sclk_clock_mhz", "gauge", "current sclk clock speed (Mhz)")
-        self.registerGPUMetric(self.__prefix + "mclk_clock_mhz", "gauge", "current mclk clock speed (Mhz)")
+        self.registerGPUMetric("sclk_clock_mhz", "gauge", "current sclk clock speed (Mhz)")
+        self.registerGPUMetric("mclk_clock_mhz", "gauge", "current mclk clock speed (Mhz)")
         # memory
-        self.registerGPUMetric(self.__prefix + "vram_total_bytes", "gauge", "VRAM Total Memory (B)")
-        self.registerGPUMetric(self.__prefix + "vram_used_percentage", "gauge", "VRAM Memory in Use (%)")
-        self.registerGPUMetric(self.__prefix + "vram_busy_percentage", "gauge", "Memory controller activity (%)")
+        self.registerGPUMetric("vram_total_bytes", "gauge", "VRAM Total Memory (B)")
+        self.registerGPUMetric("vram_used_percentage", "gauge", "VRAM Memory in Use (%)")
+        self.registerGPUMetric("vram_busy_percentage", "gauge", "Memory controller activity (%)")
+
+        # total VRAM is static: query and set once per device
+        self.__vram_total_bytes = []
+        vram_total = ctypes.c_uint64(0)
+        for i in range(self.__num_gpus):
+            ret = self.__libsmi.rsmi_dev_memory_total_get(ctypes.c_uint32(i), 0x0, ctypes.byref(vram_total))
+            self.__vram_total_bytes.append(vram_total.value)
+            self.__GPUmetrics["vram_total_bytes"].labels(card=self.__indexMapping[i]).set(vram_total.value)
+
         # utilization
-        self.registerGPUMetric(self.__prefix + "utilization_percentage", "gauge", "GPU use (%)")
+        self.registerGPUMetric("utilization_percentage", "gauge", "GPU use (%)")
         # RAS counts
         if self.__ecc_ras_monitoring:
             state = rsmi_ras_err_state_t()
@@ -374,30 +391,64 @@ class ROCMSMI(Collector):
                     ret = self.__libsmi.rsmi_dev_ecc_count_get(device, block.value, ctypes.byref(ras_counts))
                     if ret == 0:
                         key = block.name.removeprefix("RSMI_GPU_BLOCK_").lower()
-                        self.__eccBlocks[key] = block.value
-                        metric = self.__prefix + "ras_%s_correctable_count" % key
+                        correctable = "ras_%s_correctable_count" % key
+                        uncorrectable = "ras_%s_uncorrectable_count" % key
+                        # cache metric names alongside block id for use at every scrape
+                        self.__eccBlocks[key] = (block.value, correctable, uncorrectable)
                         self.registerGPUMetric(
-                            metric, "gauge", "number of correctable RAS events for %s block (count)" % key
+                            correctable, "gauge", "number of correctable RAS events for %s block (count)" % key
                         )
-                        metric = self.__prefix + "ras_%s_uncorrectable_count" % key
                         self.registerGPUMetric(
-                            metric, "gauge", "number of uncorrectable RAS events for %s block (count)" % key
+                            uncorrectable, "gauge", "number of uncorrectable RAS events for %s block (count)" % key
                         )
         # power cap
         if self.__power_cap_monitoring:
-            self.registerGPUMetric(self.__prefix + "power_cap_watts", "gauge", "Max power cap of device (W)")
+            self.registerGPUMetric("power_cap_watts", "gauge", "Max power cap of device (W)")
+            # power cap only changes on device reconfiguration: set once unless dynamic tracking requested
+            if not self.__power_cap_dynamic:
+                power = ctypes.c_uint64(0)
+                for i in range(self.__num_gpus):
+                    ret = self.__libsmi.rsmi_dev_power_cap_get(ctypes.c_uint32(i), 0x0, ctypes.byref(power))
+                    # rsmi value in microwatts -> convert to watt
+                    self.__GPUmetrics["power_cap_watts"].labels(card=self.__indexMapping[i]).set(power.value / 1000000)
 
         if self.__cu_occupancy_monitoring:
             # Measure the number CUs in each GPU node ID (KFD internal GPU index),
             # and map it to KFD GPU indices.
             counts = count_compute_units(nodeMapping.values())
             self.__num_compute_units = {i: counts[node] for i, node in nodeMapping.items()}
-            self.registerGPUMetric(self.__prefix + "num_compute_units", "gauge", "Number of compute units")
-            self.registerGPUMetric(self.__prefix + "compute_unit_occupancy", "gauge", "Compute unit occupancy")
+            self.registerGPUMetric("num_compute_units", "gauge", "Number of compute units")
+            self.registerGPUMetric("compute_unit_occupancy", "gauge", "Compute unit occupancy")
+            # number of CUs is static: set once per device
+            for i in range(self.__num_gpus):
+                self.__GPUmetrics["num_compute_units"].labels(card=self.__indexMapping[i]).set(
+                    self.__num_compute_units[i]
+                )
+
+        # Pre-bind per-device gauge setters (keyed by metric name) used every scrape
+        self.__setters = []
+        for i in range(self.__num_gpus):
+            gpuLabel = self.__indexMapping[i]
+            setters = {}
+            for metric, gauge in self.__GPUmetrics.items():
+                if metric == "temperature_celsius":
+                    setters[metric] = gauge.labels(card=gpuLabel, location=self.__temp_location_name).set
+                elif metric == "temperature_memory_celsius":
+                    setters[metric] = gauge.labels(card=gpuLabel, location=self.__temp_memory_location_name).set
+                else:
+                    setters[metric] = gauge.labels(card=gpuLabel).set
+            self.__setters.append(setters)
 
         return
 
     def updateMetrics(self):
+        # coalesce updates requested within the minimum SMI sampling interval (gauges retain previous values)
+        now = time.monotonic_ns()
+        if now - self.__lastSampleNs < self.__minSampleIntervalNs:
+            self.__numCachedSamples += 1
+            logging.debug("Skipping SMI query within minimum sample interval (%i skipped)" % self.__numCachedSamples)
+            return
+        self.__lastSampleNs = now
         self.collect_data_incremental()
         return
 
@@ -405,6 +456,7 @@ class ROCMSMI(Collector):
     # Additional custom methods unique to this collector
 
     def registerGPUMetric(self, metricName, type, description, labelExtra=None):
+        """Register GPU metric: gauge is exposed with collector prefix but cached by unprefixed name"""
         if metricName in self.__GPUmetrics:
             logging.error("Ignoring duplicate metric name addition: %s" % (metricName))
             return
@@ -413,132 +465,131 @@ class ROCMSMI(Collector):
             if labelExtra:
                 for entry in labelExtra:
                     labelnames.append(entry)
-            self.__GPUmetrics[metricName] = Gauge(metricName, description, labelnames=labelnames)
+            fullName = self.__prefix + metricName
+            self.__GPUmetrics[metricName] = Gauge(fullName, description, labelnames=labelnames)
 
-            logging.info("--> [registered] %s -> %s (gauge)" % (metricName, description))
+            logging.info("--> [registered] %s -> %s (gauge)" % (fullName, description))
         else:
             logging.error("Ignoring unknown metric type -> %s" % type)
         return
 
-    def collect_data_incremental(self):
-        # ---
-        # Collect and parse latest GPU metrics from rocm SMI library
-        # ---
+    def query_device(self, i):
+        """Query SMI data for a single device and return list of (gauge setter, value) updates.
+
+        Runs in a worker thread: ctypes buffers are allocated per call and gauges are updated by the caller.
+        """
 
         temperature = ctypes.c_int64(0)
         temp_metric = ctypes.c_int32(0)  # 0=RSMI_TEMP_CURRENT
-        temp_location = ctypes.c_int32(0)  # 0=RSMI_TEMP_TYPE_EDGE
         power = ctypes.c_uint64(0)
         power_type = rsmi_power_type_t()
-        freq = self.__rsmi_frequencies_type
+        freq = type(self.__rsmi_frequencies_type)()
         freq_system_clock = 0  # 0=RSMI_CLK_TYPE_SYS
         freq_mem_clock = 4  # 4=RSMI_CLK_TYPE_MEM
-        vram_total = ctypes.c_uint64(0)
         vram_used = ctypes.c_uint64(0)
         vram_busy = ctypes.c_uint32(0)
         utilization = ctypes.c_uint32(0)
-        pcie_sent = ctypes.c_uint64(0)
-        pcie_received = ctypes.c_uint64(0)
-        pcie_max_pkt_sz = ctypes.c_uint64(0)
         ras_counts = rsmi_error_count_t()
 
-        for i in range(self.__num_gpus):
+        updates = []
 
-            device = ctypes.c_uint32(i)
-            guid = self.__guidMapping[i]
-            gpuLabel = self.__indexMapping[i]
+        device = ctypes.c_uint32(i)
+        guid = self.__guidMapping[i]
+        setters = self.__setters[i]
+
+        # --
+        # temperature [millidegrees Celcius, converted to degrees Celcius]
+        metric = "temperature_celsius"
+        ret = self.__libsmi.rsmi_dev_temp_metric_get(
+            device, self.__temp_location_index, temp_metric, ctypes.byref(temperature)
+        )
+        updates.append((setters[metric], temperature.value / 1000.0))
 
-            # --
-            # temperature [millidegrees Celcius, converted to degrees Celcius]
-            metric = self.__prefix + "temperature_celsius"
+        # --
+        # HBM temperature [millidegrees Celcius, converted to degrees Celcius]
+        if self.__temp_memory_location_index:
+            metric = "temperature_memory_celsius"
             ret = self.__libsmi.rsmi_dev_temp_metric_get(
-                device, self.__temp_location_index, temp_metric, ctypes.byref(temperature)
-            )
-            self.__GPUmetrics[metric].labels(card=gpuLabel, location=self.__temp_location_name).set(
-                temperature.value / 1000.0
+                device, self.__temp_memory_location_index, temp_metric, ctypes.byref(temperature)
             )
+            updates.append((setters[metric], temperature.value / 1000.0))
 
-            # --
-            # HBM temperature [millidegrees Celcius, converted to degrees Celcius]
-            if self.__temp_memory_location_index:
-                metric = self.__prefix + "temperature_memory_celsius"
-                ret = self.__libsmi.rsmi_dev_temp_metric_get(
-                    device, self.__temp_memory_location_index, temp_metric, ctypes.byref(temperature)
-                )
-                self.__GPUmetrics[metric].labels(card=gpuLabel, location=self.__temp_memory_location_name).set(
-                    temperature.value / 1000.0
-                )
+        # --
+        # average socket power [micro Watts, converted to Watts]
+        metric = "average_socket_power_watts"
+        if self.__smiVersion["major"] < 6:
+            ret = self.__libsmi.rsmi_dev_power_ave_get(device, 0, ctypes.byref(power))
+        else:
+            ret = self.__libsmi.rsmi_dev_power_get(device, ctypes.byref(power), ctypes.byref(power_type))
+        if ret == 0:
+            updates.append((setters[metric], power.value / 1000000.0))
+        else:
+            updates.append((setters[metric], 0.0))
+
+        # --
+        # clock speeds [Hz, converted to megaHz]
+        metric = "sclk_clock_mhz"
+        ret = self.__libsmi.rsmi_dev_gpu_clk_freq_get(device, freq_system_clock, ctypes.byref(freq))
+        updates.append((setters[metric], freq.frequency[freq.current] / 1000000.0))
+
+        metric = "mclk_clock_mhz"
+        ret = self.__libsmi.rsmi_dev_gpu_clk_freq_get(device, freq_mem_clock, ctypes.byref(freq))
+        updates.append((setters[metric], freq.frequency[freq.current] / 1000000.0))
+
+        # --
+        # gpu memory [percentage of cached total_vram]
+        metric = "vram_used_percentage"
+        ret = self.__libsmi.rsmi_dev_memory_usage_get(device, 0x0, ctypes.byref(vram_used))
+        percentage = round(100.0 * vram_used.value / self.__vram_total_bytes[i], 4)
+        updates.append((setters[metric], percentage))
+
+        metric = "vram_busy_percentage"
+        ret = self.__libsmi.rsmi_dev_memory_busy_percent_get(device, ctypes.byref(vram_busy))
+        updates.append((setters[metric], vram_busy.value))
+
+        # --
+        # utilization
+        metric = "utilization_percentage"
+        ret = self.__libsmi.rsmi_dev_busy_percent_get(device, ctypes.byref(utilization))
+        updates.append((setters[metric], utilization.value))
 
-            # --
-            # average socket power [micro Watts, converted to Watts]
-            metric = self.__prefix + "average_socket_power_watts"
-            if self.__smiVersion["major"] < 6:
-                ret = self.__libsmi.rsmi_dev_power_ave_get(device, 0, ctypes.byref(power))
-            else:
-                ret = self.__libsmi.rsmi_dev_power_get(device, ctypes.byref(power), ctypes.byref(power_type))
-            if ret == 0:
-                self.__GPUmetrics[metric].labels(card=gpuLabel).set(power.value / 1000000.0)
-            else:
-                self.__GPUmetrics[metric].labels(card=gpuLabel).set(0.0)
-
-            # --
-            # clock speeds [Hz, converted to megaHz]
-            metric = self.__prefix + "sclk_clock_mhz"
-            ret = self.__libsmi.rsmi_dev_gpu_clk_freq_get(device, freq_system_clock, ctypes.byref(freq))
-            self.__GPUmetrics[metric].labels(card=gpuLabel).set(freq.frequency[freq.current] / 1000000.0)
-
-            metric = self.__prefix + "mclk_clock_mhz"
-            ret = self.__libsmi.rsmi_dev_gpu_clk_freq_get(device, freq_mem_clock, ctypes.byref(freq))
-            self.__GPUmetrics[metric].labels(card=gpuLabel).set(freq.frequency[freq.current] / 1000000.0)
-
-            # --
-            # gpu memory [total_vram in bytes]
-            metric = self.__prefix + "vram_total_bytes"
-            ret = self.__libsmi.rsmi_dev_memory_total_get(device, 0x0, ctypes.byref(vram_total))
-            self.__GPUmetrics[metric].labels(card=gpuLabel).set(vram_total.value)
-
-            metric = self.__prefix + "vram_used_percentage"
-            ret = self.__libsmi.rsmi_dev_memory_usage_get(device, 0x0, ctypes.byref(vram_used))
-            percentage = round(100.0 * vram_used.value / vram_total.value, 4)
-            self.__GPUmetrics[metric].labels(card=gpuLabel).set(percentage)
-
-            metric = self.__prefix + "vram_busy_percentage"
-            ret = self.__libsmi.rsmi_dev_memory_busy_percent_get(device, ctypes.byref(vram_busy))
-            self.__GPUmetrics[metric].labels(card=gpuLabel).set(vram_busy.value)
-
-            # --
-            # utilization
-            metric = self.__prefix + "utilization_percentage"
-            ret = self.__libsmi.rsmi_dev_busy_percent_get(device, ctypes.byref(utilization))
-            self.__GPUmetrics[metric].labels(card=gpuLabel).set(utilization.value)
-
-            # --
-            # RAS counts
-            if self.__ecc_ras_monitoring:
-                for key, block in self.__eccBlocks.items():
-                    ret = self.__libsmi.rsmi_dev_ecc_count_get(device, block, ctypes.byref(ras_counts))
-                    self.__GPUmetrics[self.__prefix + "ras_%s_correctable_count" % key].labels(card=gpuLabel).set(
-                        ras_counts.correctable_err
-                    )
-                    self.__GPUmetrics[self.__prefix + "ras_%s_uncorrectable_count" % key].labels(card=gpuLabel).set(
-                        ras_counts.uncorrectable_err
-                    )
-            # --
-            # power cap
-            if self.__power_cap_monitoring:
-                metric = self.__prefix + "power_cap_watts"
-                ret = self.__libsmi.rsmi_dev_power_cap_get(device, 0x0, ctypes.byref(power))
-                # rsmi value in microwatts -> convert to watt
-                self.__GPUmetrics[metric].labels(card=gpuLabel).set(power.value / 1000000)
-
-            # --
-            # CU occupancy
-            if self.__cu_occupancy_monitoring:
-                metric = self.__prefix + "num_compute_units"
-                self.__GPUmetrics[metric].labels(card=gpuLabel).set(self.__num_compute_units[i])
-
-                metric = self.__prefix + "compute_unit_occupancy"
-                cu_occupancy = get_occupancy(guid)
-                self.__GPUmetrics[metric].labels(card=gpuLabel).set(cu_occupancy)
+        # --
+        # RAS counts
+        if self.__ecc_ras_monitoring:
+            for block, correctable, uncorrectable in self.__eccBlocks.values():
+                ret = self.__libsmi.rsmi_dev_ecc_count_get(device, block, ctypes.byref(ras_counts))
+                updates.append((setters[correctable], ras_counts.correctable_err))
+                updates.append((setters[uncorrectable], ras_counts.uncorrectable_err))
+        # --
+        # power cap
+        if self.__power_cap_monitoring and self.__power_cap_dynamic:
+            metric = "power_cap_watts"
+            ret = self.__libsmi.rsmi_dev_power_cap_get(device, 0x0, ctypes.byref(power))
+            # rsmi value in microwatts -> convert to watt
+            updates.append((setters[metric], power.value / 1000000))
+
+        # --
+        # CU occupancy
+        if self.__cu_occupancy_monitoring:
+            metric = "compute_unit_occupancy"
+            cu_occupancy = get_occupancy(guid)
+            updates.append((setters[metric], cu_occupancy))
+
+        return updates
+
+    def collect_data_incremental(self):
+        # ---
+        # Collect and parse latest GPU metrics from rocm SMI library
+        # ---
+
+        # ctypes releases the GIL during SMI calls: query devices concurrently when more than one is present
+        if self.__executor:
+            results = self.__executor.map(self.query_device, range(self.__num_gpus))
+        else:
+            results = map(self.query_device, range(self.__num_gpus))
+
+        for updates in results:
+            for setter, value in updates:
+                setter(value)
 
         return
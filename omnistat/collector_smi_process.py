@@ -34,11 +34,19 @@ The following example highlights example metrics:
 
 amdsmi_process_compute (card=0, pid=123, name=torchrun) 36.0
 amdsmi_process_vram (card=0, pid=123, name=torchrun) 3784658734
+
+Process names are truncated to "amd_smi_process_name_length" characters (default 32)
+to bound label cardinality.
 """
 
+import concurrent.futures
 import logging
 
 from amdsmi import (
+    AmdSmiException,
+    AmdSmiLibraryException,
+    AmdSmiRetCode,
+    amdsmi_get_gpu_kfd_info,
     amdsmi_get_gpu_process_info,
     amdsmi_get_gpu_process_list,
     amdsmi_get_processor_handles,
@@ -47,7 +55,27 @@ from amdsmi import (
 from prometheus_client import Gauge
 
 from omnistat.collector_base import Collector
-from omnistat.utils import GPU_MAPPING_ORDER
+from omnistat.utils import gpu_index_mapping_based_on_guids
+
+
+def probe_process_info(devices):
+    """Check whether process info queries are supported by the local ROCm version
+
+    Returns:
+        bool: support status, or None if no GPU process is running to probe against
+    """
+    for device in devices:
+        for process in amdsmi_get_gpu_process_list(device):
+            try:
+                amdsmi_get_gpu_process_info(device, process)
+                return True
+            except AmdSmiLibraryException as e:
+                if e.get_error_code() == AmdSmiRetCode.STATUS_NOT_SUPPORTED:
+                    return False
+                # process exited after being listed: probe the next one
+            except AmdSmiException:
+                continue
+    return None
 
 
 def get_gpu_processes(device):
@@ -57,9 +85,9 @@ def get_gpu_processes(device):
     for p in processes:
         try:
             p = amdsmi_get_gpu_process_info(device, p)
-        except:
-            # Catch all for unsupported rocm version for process info
-            return result
+        except AmdSmiException:
+            # process exited after being listed
+            continue
         # Ignore the Python process itself for the reading
         if p["name"] == "python3" and (p["mem"] == 4096 or p["memory_usage"]["vram_mem"] == 12288):
             continue
@@ -68,7 +96,7 @@ def get_gpu_processes(device):
 
 
 class AMDSMIProcess(Collector):
-    def __init__(self):
+    def __init__(self, runtimeConfig=None):
         logging.debug("Initializing AMD SMI Process data collector")
         self.__prefix = "amdsmi_process_"
         amdsmi_init()
@@ -76,14 +104,24 @@ class AMDSMIProcess(Collector):
         self.metric_vram = None
         self.metric_compute = None
         self.devices = []
-        self.process_metrics = {}
-        self.c = 0
+        self.card_ids = []
+        self.process_metrics = set()
+        self.executor = None
+        self.process_info_supported = None
+        self.name_length = runtimeConfig["collector_amd_smi_process_name_length"]
 
     def registerMetrics(self):
         """Query number of devices and register metrics of interest"""
 
         devices = amdsmi_get_processor_handles()
         self.devices = devices
+        # card labels (HIP_VISIBLE_DEVICES indexing) resolved once per device
+        guidMapping = {index: amdsmi_get_gpu_kfd_info(device)["kfd_id"] for index, device in enumerate(devices)}
+        indexMapping = gpu_index_mapping_based_on_guids(guidMapping, len(devices))
+        self.card_ids = [str(indexMapping[index]) for index in range(len(devices))]
+        # thread pool used to query multiple devices concurrently
+        if len(devices) > 1:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(devices))
         metric_vram = Gauge(
             f"{self.__prefix}vram",
             f"{self.__prefix}vram",
@@ -101,41 +139,44 @@ class AMDSMIProcess(Collector):
 
     def updateMetrics(self):
 
-        self.collect_data_incremental()
-        # Remove old labels for process not currently running
-        for metric, counter in self.process_metrics.items():
-            if counter < self.c:
-                # catch edge case for multiple metrics with same name
-                try:
-                    self.metric_vram.remove(metric[0], metric[1], metric[2])
-                except:
-                    pass
-                try:
-                    self.metric_compute.remove(metric[0], metric[1], metric[2])
-                except:
-                    pass
+        active_metrics = self.collect_data_incremental()
+        # Remove labels for processes seen in the previous sample that are no longer running;
+        # only labels from the last sample are tracked so the set never outgrows active processes
+        for metric in self.process_metrics - active_metrics:
+            self.metric_vram.remove(*metric)
+            self.metric_compute.remove(*metric)
+        self.process_metrics = active_metrics
 
         return
 
     def collect_data_incremental(self):
-        self.c += 1
-        for idx, device in enumerate(self.devices):
-
-            processes = get_gpu_processes(device)
-
+        """Update process metrics and return set of label tuples for active processes"""
+        active_metrics = set()
+
+        # determine process info support once, as soon as there is a GPU process to probe
+        if self.process_info_supported is None:
+            self.process_info_supported = probe_process_info(self.devices)
+            if self.process_info_supported is None:
+                return active_metrics
+            if not self.process_info_supported:
+                logging.warning("GPU process info not supported by local ROCm version - skipping process metrics")
+                self.devices = []
+                self.card_ids = []
+
+        if self.executor:
+            device_processes = self.executor.map(get_gpu_processes, self.devices)
+        else:
+            device_processes = map(get_gpu_processes, self.devices)
+
+        for idx, processes in enumerate(device_processes):
+
+            cardId = self.card_ids[idx]
             for process in processes:
-                metric_tuple = (str(GPU_MAPPING_ORDER[idx]), process["name"], str(process["pid"]))
-
-                self.process_metrics[metric_tuple] = self.c
-                self.metric_vram.labels(
-                    card=str(GPU_MAPPING_ORDER[idx]),
-                    name=str(process["name"]),
-                    pid=str(process["pid"]),
-                ).set(process["memory_usage"]["vram_mem"])
-                self.metric_compute.labels(
-                    card=str(GPU_MAPPING_ORDER[idx]),
-                    name=str(process["name"]),
-                    pid=str(process["pid"]),
-                ).set(process["engine_usage"]["gfx"])
+                # label values in metric order: card, name, pid
+                metric_tuple = (cardId, str(process["name"])[: self.name_length], str(process["pid"]))
 
-        return
+                active_metrics.add(metric_tuple)
+                self.metric_vram.labels(*metric_tuple).set(process["memory_usage"]["vram_mem"])
+                self.metric_compute.labels(*metric_tuple).set(process["engine_usage"]["gfx"])
+
+        return active_metrics
@@ -41,12 +41,13 @@ rocm_mlck_clock_mhz{card="0"} 1200.0
 rocm_slck_clock_mhz{card="0"} 300.0
 """
 
+import concurrent.futures
 import logging
-import statistics
+import operator
 import sys
+import time
 
 import amdsmi as smi
-import packaging.version
 from prometheus_client import Gauge
 
 from omnistat.collector_base import Collector
@@ -61,22 +62,23 @@ def check_min_version(minVersion):
     localVer = smi.amdsmi_get_lib_version()
     # deal with evolving API
     if "year" in localVer:
-        localVerString = ".".join([str(localVer["year"]), str(localVer["major"]), str(localVer["minor"])])
+        vloc = (int(localVer["year"]), int(localVer["major"]), int(localVer["minor"]))
     elif "major" in localVer and "release" in localVer:
-        localVerString = ".".join([str(localVer["major"]), str(localVer["minor"]), str(localVer["release"])])
+        vloc = (int(localVer["major"]), int(localVer["minor"]), int(localVer["release"]))
     else:
         logging.error("ERROR: Unable to determine amdsmi library version")
         sys.exit(4)
-    vmin = packaging.version.Version(minVersion)
-    vloc = packaging.version.Version(localVerString)
+    # versions are simple numeric triples: compare as int tuples
+    vmin = tuple(int(x) for x in minVersion.split("."))
+    localVerString = ".".join(str(x) for x in vloc)
     if vloc < vmin:
         logging.error("")
         logging.error("ERROR: Minimum amdsmi version not met.")
-        logging.error("--> Detected version = %s (>= %s required)" % (vloc, vmin))
+        logging.error("--> Detected version = %s (>= %s required)" % (localVerString, minVersion))
         logging.error("")
         sys.exit(4)
     else:
-        logging.info("--> library version = %s" % vloc)
+        logging.info("--> library version = %s" % localVerString)
 
 
 def is_positive_int(s):
@@ -86,6 +88,76 @@ def is_positive_int(s):
         return False
 
 
+# gpu_metrics_info keys providing the same reading as amdsmi_get_temp_metric() for a
+# given temperature location: (key, list index or None)
+TEMPERATURE_METRICS_KEYS = {
+    "EDGE": ("temperature_edge", None),
+    "HOTSPOT": ("temperature_hotspot", None),
+    "JUNCTION": ("temperature_hotspot", None),
+    "VRAM": ("temperature_mem", None),
+    "HBM_0": ("temperature_hbm", 0),
+    "HBM_1": ("temperature_hbm", 1),
+    "HBM_2": ("temperature_hbm", 2),
+    "HBM_3": ("temperature_hbm", 3),
+}
+
+
+def temperature_from_metrics(metrics, source):
+    """Extract temperature reading from a gpu_metrics_info result (None if unavailable)"""
+    key, index = source
+    value = metrics.get(key)
+    if index is not None:
+        if not isinstance(value, list) or index >= len(value):
+            return None
+        value = value[index]
+    if not is_positive_int(value):
+        return None
+    return value
+
+
+# amdsmi_get_gpu_ecc_count() fields exposed per RAS block (extracted with a single itemgetter call)
+RAS_COUNTS = ("correctable_count", "uncorrectable_count", "deferred_count")
+RAS_COUNTS_GETTER = operator.itemgetter(*RAS_COUNTS)
+
+# valid (primary, memory) temperature locations per ASIC market name
+TEMPERATURE_LOCATIONS = {}
+
+
+def probe_temperature_locations(device):
+    """Find first valid primary and memory temperature locations (single pass over available locations)
+
+    Returns:
+        tuple: (primary location, memory location), either of which may be None
+    """
+    location = None
+    memoryLocation = None
+    for item in smi.AmdSmiTemperatureType:
+        isMemory = "HBM" in item.name or "VRAM" in item.name
+        if location is not None and not isMemory:
+            continue
+        try:
+            temperature = smi.amdsmi_get_temp_metric(device, item, smi.AmdSmiTemperatureMetric.CURRENT)
+        except smi.AmdSmiException:
+            continue
+        if temperature <= 0:
+            continue
+        if location is None:
+            location = item
+        if isMemory and memoryLocation is None:
+            memoryLocation = item
+        if location is not None and memoryLocation is not None:
+            break
+    return location, memoryLocation
+
+
+def query_version_info(device):
+    """Query static versioning info for a device: returns (vbios, type, driver version)"""
+    vbios_info = smi.amdsmi_get_gpu_vbios_info(device)
+    asic_info = smi.amdsmi_get_gpu_asic_info(device)
+    driver_info = smi.amdsmi_get_gpu_driver_info(device)
+    return vbios_info["part_number"], asic_info["market_name"], driver_info["driver_version"]
+
+
 class AMDSMI(Collector):
     def __init__(self, runtimeConfig=None):
         logging.debug("Initializing AMD SMI data collector")
@@ -99,19 +171,26 @@ class AMDSMI(Collector):
         self.__metricMapping = {}
         self.__ecc_ras_monitoring = runtimeConfig["collector_ras_ecc"]
         self.__power_cap_monitoring = runtimeConfig["collector_power_capping"]
+        self.__power_cap_dynamic = runtimeConfig["collector_power_cap_dynamic"]
         self.__cu_occupancy_monitoring = runtimeConfig["collector_cu_occupancy"]
+        self.__minSampleIntervalNs = runtimeConfig["collector_smi_min_sample_interval_ms"] * 1000000
+        self.__lastSampleNs = -self.__minSampleIntervalNs
+        self.__numCachedSamples = 0
         self.__eccBlocks = {}
+        self.__executor = None
+        # cache enum members used on every scrape
+        self.__vram_type = smi.AmdSmiMemoryType.VRAM
+        self.__temp_current = smi.AmdSmiTemperatureMetric.CURRENT
         # verify minimum version met
         check_min_version("24.7.1")
 
-    def get_gpu_metrics(self, device):
-        """Make GPU metric query and return dict of tracked metrics"""
-
-        tracked_metrics = {}
-        result = smi.amdsmi_get_gpu_metrics_info(device)
-        for smiName, metricName in self.__metricMapping.items():
-            tracked_metrics[metricName] = result[smiName]
-        return tracked_metrics
+    def probe_temperature_source(self, metrics, location):
+        """Determine if temperature for given location is available from gpu_metrics_info"""
+        source = TEMPERATURE_METRICS_KEYS.get(location.name)
+        if source and temperature_from_metrics(metrics, source) is not None:
+            logging.debug("--> Reading %s temperature from gpu metrics (%s)" % (location.name.lower(), source[0]))
+            return source
+        return None
 
     def registerMetrics(self):
         """Query number of devices and register metrics of interest"""
@@ -121,6 +200,10 @@ class AMDSMI(Collector):
         self.__num_gpus = len(devices)
         logging.debug(f"Number of devices = {self.__num_gpus}")
 
+        # thread pool used to query multiple devices concurrently
+        if self.__num_gpus > 1:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.__num_gpus)
+
         # Register/set metrics that we do not expect to change
 
         # number of GPUs
@@ -148,16 +231,15 @@ class AMDSMI(Collector):
             labelnames=["card", "driver_ver", "vbios", "type", "schema"],
         )
 
-        for idx, device in enumerate(self.__devices):
-            gpuLabel = self.__indexMapping[idx]
-            vbios_info = smi.amdsmi_get_gpu_vbios_info(device)
-            vbios = vbios_info["part_number"]
-            asic_info = smi.amdsmi_get_gpu_asic_info(device)
-            devtype = asic_info["market_name"]
-
-            driver_info = smi.amdsmi_get_gpu_driver_info(device)
-            gpuDriverVer = driver_info["driver_version"]
+        if self.__executor:
+            version_info = self.__executor.map(query_version_info, self.__devices)
+        else:
+            version_info = map(query_version_info, self.__devices)
 
+        for idx, (vbios, devtype, gpuDriverVer) in enumerate(version_info):
+            if idx == 0:
+                asicName = devtype
+            gpuLabel = self.__indexMapping[idx]
             version_metric.labels(
                 card=gpuLabel, driver_ver=gpuDriverVer, vbios=vbios, type=devtype, schema=self.__schema
             ).set(1)
@@ -170,6 +252,13 @@ class AMDSMI(Collector):
             self.__prefix + "vram_used_percentage", "VRAM Memory in Use (%)", labelnames=["card"]
         )
 
+        # total VRAM is static: query and set once per device
+        self.__vram_total_bytes = []
+        for idx, device in enumerate(self.__devices):
+            device_total_vram = smi.amdsmi_get_gpu_memory_total(device, smi.AmdSmiMemoryType.VRAM)
+            self.__vram_total_bytes.append(device_total_vram)
+            self.__GPUMetrics["vram_total_bytes"].labels(card=self.__indexMapping[idx]).set(device_total_vram)
+
         # Register RAS ECC related metrics
         if self.__ecc_ras_monitoring:
             for block in smi.AmdSmiGpuBlock:
@@ -205,44 +294,38 @@ class AMDSMI(Collector):
                     except:
                         logging.debug("Skipping RAS definition for %s" % block)
 
-        # Cache valid primary temperature location and register with location label
-        dev0 = self.__devices[0]
-        for item in smi.AmdSmiTemperatureType:
-            try:
-                temperature = smi.amdsmi_get_temp_metric(dev0, item, smi.AmdSmiTemperatureMetric.CURRENT)
-            except smi.AmdSmiException:
-                continue
-            if temperature > 0:
-                self.__temp_location_index = item
-                self.__temp_location_name = item.name.lower()
-                logging.info("--> Using primary temperature location at %s" % self.__temp_location_name)
-                break
+        # Cache valid primary and memory temperature locations (probed once per ASIC type)
+        # and register with location label
+        if asicName not in TEMPERATURE_LOCATIONS:
+            TEMPERATURE_LOCATIONS[asicName] = probe_temperature_locations(self.__devices[0])
+        self.__temp_location_index, self.__temp_memory_location_index = TEMPERATURE_LOCATIONS[asicName]
+        if self.__temp_location_index is not None:
+            self.__temp_location_name = self.__temp_location_index.name.lower()
+            logging.info("--> Using primary temperature location at %s" % self.__temp_location_name)
+        if self.__temp_memory_location_index is not None:
+            self.__temp_memory_location_name = self.__temp_memory_location_index.name.lower()
+            logging.info("--> Using HBM temperature location at %s" % self.__temp_memory_location_name)
+
         self.__GPUMetrics["temperature_celsius"] = Gauge(
             self.__prefix + "temperature_celsius", "Temperature (C)", labelnames=["card", "location"]
         )
 
-        # Cache valid memory temperature location and register with location label
-        self.__temp_memory_location_index = None
-        dev0 = self.__devices[0]
-        for item in smi.AmdSmiTemperatureType:
-            if "HBM" in item.name or "VRAM" in item.name:
-                try:
-                    temperature = smi.amdsmi_get_temp_metric(dev0, item, smi.AmdSmiTemperatureMetric.CURRENT)
-                except smi.AmdSmiException:
-                    continue
-                if temperature > 0:
-                    self.__temp_memory_location_index = item
-                    self.__temp_memory_location_name = item.name.lower()
-                    logging.info("--> Using HBM temperature location at %s" % self.__temp_memory_location_name)
-                    break
-            else:
-                continue
-
         if self.__temp_memory_location_index:
             self.__GPUMetrics["temperature_memory_celsius"] = Gauge(
                 self.__prefix + "temperature_memory_celsius", "HBM Temperature (C)", labelnames=["card", "location"]
             )
 
+        # Prefer reading temperatures from the gpu_metrics_info query already made every
+        # scrape; only fall back to dedicated amdsmi_get_temp_metric() calls when the
+        # corresponding fields are not populated.
+        metrics = smi.amdsmi_get_gpu_metrics_info(self.__devices[0])
+        self.__temp_metrics_source = self.probe_temperature_source(metrics, self.__temp_location_index)
+        self.__temp_memory_metrics_source = None
+        if self.__temp_memory_location_index:
+            self.__temp_memory_metrics_source = self.probe_temperature_source(
+                metrics, self.__temp_memory_location_index
+            )
+
         # Define mapping from amdsmi variable names to omnistat metric, incuding units where appropriate
         self.__metricMapping = {
             # core GPU metric definitions
@@ -258,14 +341,16 @@ class AMDSMI(Collector):
         metric_check["average_socket_power_watts"] = ["average_socket_power", "current_socket_power"]
         metric_check["mclk_clock_mhz"] = ["average_uclk_frequency", "current_uclk"]
 
-        dev0 = self.__devices[0]
-        metrics = smi.amdsmi_get_gpu_metrics_info(dev0)
+        # reuse the gpu_metrics_info snapshot from the temperature probe above
         self.__source_labels = {}
 
         for desired_metric in metric_check:
             found = None
             for key in metric_check[desired_metric]:
                 if is_positive_int(metrics[key]):
+                    # one amdsmi key per metric: drop any default mapping for the other candidate keys
+                    for candidate in metric_check[desired_metric]:
+                        self.__metricMapping.pop(candidate, None)
                     self.__metricMapping[key] = desired_metric
                     self.__source_labels[desired_metric] = key
                     found = key
@@ -280,20 +365,42 @@ class AMDSMI(Collector):
                     self.__prefix + desired_metric, f"{desired_metric}", labelnames=["card", "source"]
                 )
 
-        # Register remaining metrics of interest available from get_gpu_metrics()
-        for idx, device in enumerate(self.__devices):
-            metrics = self.get_gpu_metrics(device)
-            for metric in metrics:
-                metric_name = self.__prefix + metric
-                # add Gauge metric only once
-                if metric_name not in self.__GPUMetrics.keys():
-                    self.__GPUMetrics[metric_name] = Gauge(metric_name, f"{metric}", labelnames=["card"])
+        # Register remaining metrics of interest available from gpu_metrics_info
+        for metric in self.__metricMapping.values():
+            metric_name = self.__prefix + metric
+            # add Gauge metric only once
+            if metric_name not in self.__GPUMetrics:
+                self.__GPUMetrics[metric_name] = Gauge(metric_name, f"{metric}", labelnames=["card"])
+
+        # Pre-bind gauge setters for mapped metrics (indexed by device, ordered as the amdsmi
+        # keys extracted by a single itemgetter call); both are built from the same
+        # (amdsmi key, metric) pairs holding exactly one key per metric
+        mappedMetrics = list(self.__metricMapping.items())
+        self.__metricGetter = operator.itemgetter(*(smiKey for smiKey, _ in mappedMetrics))
+        self.__mappedSetters = []
+        for idx in range(self.__num_gpus):
+            cardId = self.__indexMapping[idx]
+            setters = []
+            for _, metricName in mappedMetrics:
+                gauge = self.__GPUMetrics[self.__prefix + metricName]
+                if metricName in self.__source_labels:
+                    setters.append(gauge.labels(cardId, self.__source_labels[metricName]).set)
+                else:
+                    setters.append(gauge.labels(cardId).set)
+            self.__mappedSetters.append(setters)
 
         # Register power capping setting
         if self.__power_cap_monitoring:
             self.__GPUMetrics["power_cap_watts"] = Gauge(
                 self.__prefix + "power_cap_watts", "Max power cap of device (W)", labelnames=["card"]
             )
+            # power cap only changes on device reconfiguration: set once unless dynamic tracking requested
+            if not self.__power_cap_dynamic:
+                for idx, device in enumerate(self.__devices):
+                    power_info = smi.amdsmi_get_power_cap_info(device)
+                    self.__GPUMetrics["power_cap_watts"].labels(card=self.__indexMapping[idx]).set(
+                        power_info["power_cap"] / 1000000
+                    )
 
         if self.__cu_occupancy_monitoring:
             # Measure the number CUs in each GPU node ID (KFD internal GPU index),
@@ -307,75 +414,129 @@ class AMDSMI(Collector):
                 self.__prefix + "compute_unit_occupancy", "Compute unit occupancy (# of CUs)", labelnames=["card"]
             )
 
+        # Last observed values for slowly-changing counters (updated only on change)
+        self.__lastRasCounts = [{} for idx in range(self.__num_gpus)]
+        self.__lastPowerCap = [None] * self.__num_gpus
+
+        # Pre-bind per-device gauge setters used every scrape
+        self.__vramUsedSetters = []
+        self.__temperatureSetters = []
+        self.__temperatureMemorySetters = []
+        self.__powerCapSetters = []
+        self.__cuOccupancySetters = []
+        self.__rasSetters = []
+        for idx in range(self.__num_gpus):
+            cardId = self.__indexMapping[idx]
+            # (correctable, uncorrectable, deferred) setters per RAS block, ordered as RAS_COUNTS
+            self.__rasSetters.append(
+                {
+                    key: tuple(
+                        self.__GPUMetrics["ras_%s_%s" % (key, count)].labels(card=cardId).set for count in RAS_COUNTS
+                    )
+                    for key in self.__eccBlocks
+                }
+            )
+            self.__vramUsedSetters.append(self.__GPUMetrics["vram_used_percentage"].labels(card=cardId).set)
+            self.__temperatureSetters.append(
+                self.__GPUMetrics["temperature_celsius"].labels(card=cardId, location=self.__temp_location_name).set
+            )
+            if self.__temp_memory_location_index:
+                self.__temperatureMemorySetters.append(
+                    self.__GPUMetrics["temperature_memory_celsius"]
+                    .labels(card=cardId, location=self.__temp_memory_location_name)
+                    .set
+                )
+            if self.__power_cap_monitoring:
+                self.__powerCapSetters.append(self.__GPUMetrics["power_cap_watts"].labels(card=cardId).set)
+            if self.__cu_occupancy_monitoring:
+                # number of CUs is static: set once per device
+                self.__GPUMetrics["num_compute_units"].labels(card=cardId).set(self.__num_compute_units[idx])
+                self.__cuOccupancySetters.append(self.__GPUMetrics["compute_unit_occupancy"].labels(card=cardId).set)
+
         return
 
     def updateMetrics(self):
+        # coalesce updates requested within the minimum SMI sampling interval (gauges retain previous values)
+        now = time.monotonic_ns()
+        if now - self.__lastSampleNs < self.__minSampleIntervalNs:
+            self.__numCachedSamples += 1
+            logging.debug("Skipping SMI query within minimum sample interval (%i skipped)" % self.__numCachedSamples)
+            return
+        self.__lastSampleNs = now
         self.collect_data_incremental()
         return
 
-    def collect_data_incremental(self):
-        for idx, device in enumerate(self.__devices):
+    def query_device(self, idx, device):
+        """Query SMI data for a single device and return list of (gauge setter, value) updates.
 
-            # map GPU index
-            cardId = self.__indexMapping[idx]
-            guid = self.__guidMapping[idx]
+        Runs in a worker thread: only SMI/sysfs queries are made here, gauges are updated by the caller.
+        """
 
-            #  stats available via get_gpu_metrics
-            metrics = self.get_gpu_metrics(device)
+        updates = []
 
-            for metricName, value in metrics.items():
-                metric = self.__GPUMetrics[self.__prefix + metricName]
-                if metricName in self.__source_labels:
-                    metric.labels(card=cardId, source=self.__source_labels[metricName]).set(value)
-                else:
-                    metric.labels(card=cardId).set(value)
+        guid = self.__guidMapping[idx]
 
-            # additional gpu memory-related stats
-            device_total_vram = smi.amdsmi_get_gpu_memory_total(device, smi.AmdSmiMemoryType.VRAM)
-            self.__GPUMetrics["vram_total_bytes"].labels(card=cardId).set(device_total_vram)
-            vram_used_bytes = smi.amdsmi_get_gpu_memory_usage(device, smi.AmdSmiMemoryType.VRAM)
-            percentage = round(100.0 * vram_used_bytes / device_total_vram, 4)
-            self.__GPUMetrics["vram_used_percentage"].labels(card=cardId).set(percentage)
-
-            # additional temperature-related stats
-            temperature = smi.amdsmi_get_temp_metric(
-                device, self.__temp_location_index, smi.AmdSmiTemperatureMetric.CURRENT
-            )
-            self.__GPUMetrics["temperature_celsius"].labels(card=cardId, location=self.__temp_location_name).set(
-                temperature
-            )
-            if self.__temp_memory_location_index:
+        #  stats available via gpu_metrics_info
+        metrics_info = smi.amdsmi_get_gpu_metrics_info(device)
+        updates.extend(zip(self.__mappedSetters[idx], self.__metricGetter(metrics_info)))
+
+        # additional gpu memory-related stats
+        vram_used_bytes = smi.amdsmi_get_gpu_memory_usage(device, self.__vram_type)
+        # fixed-point percentage with 4 decimal places
+        percentage = (vram_used_bytes * 1000000 // self.__vram_total_bytes[idx]) / 10000.0
+        updates.append((self.__vramUsedSetters[idx], percentage))
+
+        # additional temperature-related stats
+        temperature = None
+        if self.__temp_metrics_source:
+            temperature = temperature_from_metrics(metrics_info, self.__temp_metrics_source)
+        if temperature is None:
+            temperature = smi.amdsmi_get_temp_metric(device, self.__temp_location_index, self.__temp_current)
+        updates.append((self.__temperatureSetters[idx], temperature))
+        if self.__temp_memory_location_index:
+            hbm_temperature = None
+            if self.__temp_memory_metrics_source:
+                hbm_temperature = temperature_from_metrics(metrics_info, self.__temp_memory_metrics_source)
+            if hbm_temperature is None:
                 hbm_temperature = smi.amdsmi_get_temp_metric(
-                    device, self.__temp_memory_location_index, smi.AmdSmiTemperatureMetric.CURRENT
+                    device, self.__temp_memory_location_index, self.__temp_current
                 )
-                self.__GPUMetrics["temperature_memory_celsius"].labels(
-                    card=cardId, location=self.__temp_memory_location_name
-                ).set(hbm_temperature)
-
-            # RAS counts
-            if self.__ecc_ras_monitoring:
-                for key, block in self.__eccBlocks.items():
-                    ecc_error_counts = smi.amdsmi_get_gpu_ecc_count(device, block)
-                    metric = "ras_%s_correctable_count" % key
-                    self.__GPUMetrics["ras_%s_correctable_count" % key].labels(card=cardId).set(
-                        ecc_error_counts["correctable_count"]
-                    )
-                    self.__GPUMetrics["ras_%s_uncorrectable_count" % key].labels(card=cardId).set(
-                        ecc_error_counts["uncorrectable_count"]
-                    )
-                    self.__GPUMetrics["ras_%s_deferred_count" % key].labels(card=cardId).set(
-                        ecc_error_counts["deferred_count"]
-                    )
-            # power-capping
-            if self.__power_cap_monitoring:
-                power_info = smi.amdsmi_get_power_cap_info(device)
-                self.__GPUMetrics["power_cap_watts"].labels(card=cardId).set(power_info["power_cap"] / 1000000)
+            updates.append((self.__temperatureMemorySetters[idx], hbm_temperature))
 
-            # CU occupancy
-            if self.__cu_occupancy_monitoring:
-                self.__GPUMetrics["num_compute_units"].labels(card=cardId).set(self.__num_compute_units[idx])
+        # RAS counts
+        if self.__ecc_ras_monitoring:
+            lastCounts = self.__lastRasCounts[idx]
+            rasSetters = self.__rasSetters[idx]
+            for key, block in self.__eccBlocks.items():
+                counts = RAS_COUNTS_GETTER(smi.amdsmi_get_gpu_ecc_count(device, block))
+                # RAS counters rarely change: only update gauges when a block count moves
+                if lastCounts.get(key) == counts:
+                    continue
+                lastCounts[key] = counts
+                updates.extend(zip(rasSetters[key], counts))
+        # power-capping
+        if self.__power_cap_monitoring and self.__power_cap_dynamic:
+            power_info = smi.amdsmi_get_power_cap_info(device)
+            if power_info["power_cap"] != self.__lastPowerCap[idx]:
+                self.__lastPowerCap[idx] = power_info["power_cap"]
+                updates.append((self.__powerCapSetters[idx], power_info["power_cap"] / 1000000))
+
+        # CU occupancy
+        if self.__cu_occupancy_monitoring:
+            cu_occupancy = get_occupancy(guid)
+            updates.append((self.__cuOccupancySetters[idx], cu_occupancy))
+
+        return updates
 
-                cu_occupancy = get_occupancy(guid)
-                self.__GPUMetrics["compute_unit_occupancy"].labels(card=cardId).set(cu_occupancy)
+    def collect_data_incremental(self):
+        # SMI queries release the GIL: query devices concurrently when more than one is present
+        if self.__executor:
+            results = self.__executor.map(self.query_device, range(self.__num_gpus), self.__devices)
+        else:
+            results = map(self.query_device, range(self.__num_gpus), self.__devices)
+
+        for updates in results:
+            for setter, value in updates:
+                setter(value)
 
         return
@@ -28,25 +28,25 @@
 # or more custom collector(s).
 # --
 
-import configparser
-import importlib.resources
 import logging
-import os
-import platform
 import re
 import sys
-from pathlib import Path
+import threading
+import time
 
-from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client import generate_latest
 
 from omnistat import utils
 
+# separator for comma-delimited lists in runtime config
+LIST_SEPARATOR = re.compile(r",\s*")
+
 
 class Monitor:
     def __init__(self, config, logFile=None):
 
         if logFile:
-            hostname = platform.node().split(".", 1)[0]
+            hostname = utils.getShortHostname()
             logging.basicConfig(
                 format=f"[{hostname}: %(asctime)s] %(message)s",
                 level=logging.INFO,
@@ -58,17 +58,14 @@ class Monitor:
 
         self.runtimeConfig = {}
 
-        self.runtimeConfig["collector_enable_rocm_smi"] = config["omnistat.collectors"].getboolean(
-            "enable_rocm_smi", True
-        )
-        self.runtimeConfig["collector_enable_rms"] = config["omnistat.collectors"].getboolean("enable_rms", False)
-        self.runtimeConfig["collector_enable_amd_smi"] = config["omnistat.collectors"].getboolean(
-            "enable_amd_smi", False
-        )
-        self.runtimeConfig["collector_enable_network"] = config["omnistat.collectors"].getboolean(
-            "enable_network", True
-        )
-        self.runtimeConfig["collector_enable_vendor_counters"] = config["omnistat.collectors"].getboolean(
+        # resolve section proxy once for the collector options below
+        collectorConfig = config["omnistat.collectors"]
+
+        self.runtimeConfig["collector_enable_rocm_smi"] = collectorConfig.getboolean("enable_rocm_smi", True)
+        self.runtimeConfig["collector_enable_rms"] = collectorConfig.getboolean("enable_rms", False)
+        self.runtimeConfig["collector_enable_amd_smi"] = collectorConfig.getboolean("enable_amd_smi", False)
+        self.runtimeConfig["collector_enable_network"] = collectorConfig.getboolean("enable_network", True)
+        self.runtimeConfig["collector_enable_vendor_counters"] = collectorConfig.getboolean(
             "enable_vendor_counters", False
         )
 
@@ -80,65 +77,67 @@ class Monitor:
             logging.error('Please choose either "enable_rocm_smi" or "enable_amd_smi" in runtime config')
             sys.exit(1)
 
-        self.runtimeConfig["collector_enable_amd_smi_process"] = config["omnistat.collectors"].getboolean(
+        self.runtimeConfig["collector_enable_amd_smi_process"] = collectorConfig.getboolean(
             "enable_amd_smi_process", False
         )
-        self.runtimeConfig["collector_enable_events"] = config["omnistat.collectors"].getboolean("enable_events", False)
-        self.runtimeConfig["collector_port"] = config["omnistat.collectors"].get("port", 8001)
-        self.runtimeConfig["collector_rocm_path"] = config["omnistat.collectors"].get("rocm_path", "/opt/rocm")
-        self.runtimeConfig["collector_ras_ecc"] = config["omnistat.collectors"].getboolean("enable_ras_ecc", True)
-        self.runtimeConfig["collector_cu_occupancy"] = config["omnistat.collectors"].getboolean(
-            "enable_cu_occupancy", False
+        self.runtimeConfig["collector_amd_smi_process_name_length"] = collectorConfig.getint(
+            "amd_smi_process_name_length", 32
         )
-        self.runtimeConfig["collector_power_capping"] = config["omnistat.collectors"].getboolean(
-            "enable_power_cap", False
+        self.runtimeConfig["collector_enable_events"] = collectorConfig.getboolean("enable_events", False)
+        self.runtimeConfig["collector_port"] = collectorConfig.get("port", 8001)
+        self.runtimeConfig["collector_rocm_path"] = collectorConfig.get("rocm_path", "/opt/rocm")
+        self.runtimeConfig["collector_ras_ecc"] = collectorConfig.getboolean("enable_ras_ecc", True)
+        self.runtimeConfig["collector_cu_occupancy"] = collectorConfig.getboolean("enable_cu_occupancy", False)
+        self.runtimeConfig["collector_power_capping"] = collectorConfig.getboolean("enable_power_cap", False)
+        self.runtimeConfig["collector_power_cap_dynamic"] = collectorConfig.getboolean("power_cap_dynamic", False)
+        self.runtimeConfig["collector_smi_min_sample_interval_ms"] = collectorConfig.getint(
+            "smi_min_sample_interval_ms", 0
         )
+        self.runtimeConfig["collector_min_refresh_interval_ms"] = collectorConfig.getint("min_refresh_interval_ms", 0)
+        self.runtimeConfig["collector_refresh_interval_ms"] = collectorConfig.getint("refresh_interval_ms", 0)
 
-        self.runtimeConfig["collector_enable_rocprofiler"] = config["omnistat.collectors"].getboolean(
-            "enable_rocprofiler", False
-        )
+        self.runtimeConfig["collector_enable_rocprofiler"] = collectorConfig.getboolean("enable_rocprofiler", False)
 
-        allowed_ips = config["omnistat.collectors"].get("allowed_ips", "127.0.0.1")
-        # convert comma-separated string into list
-        self.runtimeConfig["collector_allowed_ips"] = re.split(r",\s*", allowed_ips)
-        logging.info("Allowed query IPs = %s" % self.runtimeConfig["collector_allowed_ips"])
+        allowed_ips = LIST_SEPARATOR.split(collectorConfig.get("allowed_ips", "127.0.0.1"))
+        logging.info("Allowed query IPs = %s" % allowed_ips)
+        # convert comma-separated string into set for per-request checks
+        self.runtimeConfig["collector_allowed_ips"] = frozenset(allowed_ips)
+        self.runtimeConfig["collector_allow_all_ips"] = "0.0.0.0" in self.runtimeConfig["collector_allowed_ips"]
 
         # additional RMS collector controls
         if self.runtimeConfig["collector_enable_rms"] == True:
             self.jobDetection = {}
-            self.runtimeConfig["rms_collector_annotations"] = config["omnistat.collectors.rms"].getboolean(
-                "enable_annotations", False
-            )
-            self.jobDetection["mode"] = config["omnistat.collectors.rms"].get("job_detection_mode", "file-based")
-            self.jobDetection["file"] = config["omnistat.collectors.rms"].get(
-                "job_detection_file", "/tmp/omni_rmsjobinfo"
-            )
-            self.jobDetection["stepfile"] = config["omnistat.collectors.rms"].get(
-                "step_detection_file", "/tmp/omni_rmsjobinfo_step"
-            )
+            rmsConfig = config["omnistat.collectors.rms"]
+            self.runtimeConfig["rms_collector_annotations"] = rmsConfig.getboolean("enable_annotations", False)
+            self.jobDetection["mode"] = rmsConfig.get("job_detection_mode", "file-based")
+            self.jobDetection["file"] = rmsConfig.get("job_detection_file", "/tmp/omni_rmsjobinfo")
+            self.jobDetection["stepfile"] = rmsConfig.get("step_detection_file", "/tmp/omni_rmsjobinfo_step")
             if config.has_option("omnistat.collectors.rms", "host_skip"):
-                self.runtimeConfig["rms_collector_host_skip"] = config["omnistat.collectors.rms"]["host_skip"]
+                self.runtimeConfig["rms_collector_host_skip"] = rmsConfig["host_skip"]
 
         self.runtimeConfig["rocprofiler_metrics"] = []
         if config.has_option("omnistat.collectors.rocprofiler", "metrics"):
             self.runtimeConfig["rocprofiler_metrics"] = config["omnistat.collectors.rocprofiler"]["metrics"].split(",")
 
-        # defined global prometheus metrics
-        self.__globalMetrics = {}
-        self.__registry_global = CollectorRegistry()
-
         # define desired collectors
         self.__collectors = []
 
-        # allow for disablement of resource manager data collector via regex match
-        if self.runtimeConfig["collector_enable_rms"]:
-            if config.has_option("omnistat.collectors.rms", "host_skip"):
-                host_skip = utils.removeQuotes(config["omnistat.collectors.rms"]["host_skip"])
-                hostname = platform.node().split(".", 1)[0]
-                p = re.compile(host_skip)
-                if p.match(hostname):
-                    self.runtimeConfig["collector_enable_rms"] = False
-                    logging.info("Disabling RMS collector via host_skip match (%s)" % host_skip)
+        # last generated metrics response (reused for requests within the minimum refresh interval)
+        self.__minRefreshIntervalNs = self.runtimeConfig["collector_min_refresh_interval_ms"] * 1000000
+        self.__lastRefreshNs = -self.__minRefreshIntervalNs
+        self.__lastMetrics = None
+
+        # optional background refresh: collectors are updated on a fixed cadence instead of per request
+        self.__refreshInterval = self.runtimeConfig["collector_refresh_interval_ms"] / 1000.0
+        self.__refreshThread = None
+
+        # allow for disablement of resource manager data collector via regex match; evaluated once here
+        # (before gunicorn forks workers) so collectors only ever see the final enable flag
+        if "rms_collector_host_skip" in self.runtimeConfig:
+            host_skip = utils.removeQuotes(self.runtimeConfig["rms_collector_host_skip"])
+            if re.match(host_skip, utils.getShortHostname()):
+                self.runtimeConfig["collector_enable_rms"] = False
+                logging.info("Disabling RMS collector via host_skip match (%s)" % host_skip)
 
         logging.debug("Completed collector initialization (base class)")
         return
@@ -166,7 +165,7 @@ class Monitor:
         if self.runtimeConfig["collector_enable_amd_smi_process"]:
             from omnistat.collector_smi_process import AMDSMIProcess
 
-            self.__collectors.append(AMDSMIProcess())
+            self.__collectors.append(AMDSMIProcess(runtimeConfig=self.runtimeConfig))
         if self.runtimeConfig["collector_enable_rms"]:
             from omnistat.collector_rms import RMSJob
 
@@ -196,7 +195,35 @@ class Monitor:
         for collector in self.__collectors:
             collector.updateMetrics()
 
+        if self.__refreshInterval > 0:
+            self.__lastMetrics = generate_latest()
+            self.__refreshThread = threading.Thread(target=self.refreshAllMetrics, daemon=True)
+            self.__refreshThread.start()
+            logging.info("Refreshing metrics in background every %.3f secs" % self.__refreshInterval)
+
+    def refreshAllMetrics(self):
+        """Background loop: update all collectors and cache the generated response"""
+        while True:
+            time.sleep(self.__refreshInterval)
+            try:
+                for collector in self.__collectors:
+                    collector.updateMetrics()
+                # reference assignment is atomic: requests always see a complete response
+                self.__lastMetrics = generate_latest()
+            except Exception as e:
+                logging.error("Background metric refresh failed: %s" % e)
+
     def updateAllMetrics(self):
+        # metrics refreshed in background: serve latest cached response
+        if self.__refreshThread:
+            return self.__lastMetrics
+
+        # serve previous response when requests arrive faster than the minimum refresh interval
+        now = time.monotonic_ns()
+        if self.__lastMetrics is not None and now - self.__lastRefreshNs < self.__minRefreshIntervalNs:
+            return self.__lastMetrics
+        self.__lastRefreshNs = now
         for collector in self.__collectors:
             collector.updateMetrics()
-        return generate_latest()
+        self.__lastMetrics = generate_latest()
+        return self.__lastMetrics
@@ -40,7 +40,8 @@ import signal
 import sys
 
 import gunicorn.app.base
-from flask import Flask, abort, jsonify, request
+from flask import Flask, Response, abort, jsonify, request
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from omnistat import utils
 from omnistat.monitor import Monitor
@@ -77,14 +78,16 @@ def main():
     app = Flask("omnistat")
     monitor = Monitor(config)
 
-    # Enforce network restrictions
-    @app.before_request
+    # Enforce network restrictions (allowed set bound once; no hook needed when all IPs are allowed)
+    allowedIPs = monitor.runtimeConfig["collector_allowed_ips"]
+
     def restrict_ips():
-        if "0.0.0.0" in monitor.runtimeConfig["collector_allowed_ips"]:
-            return
-        elif request.remote_addr not in monitor.runtimeConfig["collector_allowed_ips"]:
+        if request.remote_addr not in allowedIPs:
             abort(403)
 
+    if not monitor.runtimeConfig["collector_allow_all_ips"]:
+        app.before_request(restrict_ips)
+
     @app.errorhandler(403)
     def forbidden(e):
         return jsonify(error="Access denied"), 403
@@ -93,7 +96,8 @@ def main():
     # preserve the state of the collectors.
     def post_fork(server, worker):
         monitor.initMetrics()
-        app.route("/metrics")(lambda: (monitor.updateAllMetrics(), {"Content-Type": "text/plain; charset=utf-8"}))
+        # serve the pre-generated exposition payload as-is
+        app.route("/metrics")(lambda: Response(monitor.updateAllMetrics(), content_type=CONTENT_TYPE_LATEST))
         app.route("/shutdown")(shutdown)
 
     listenPort = config["omnistat.collectors"].get("port", 8001)
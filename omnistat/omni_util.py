@@ -24,24 +24,32 @@
 # -------------------------------------------------------------------------------
 
 import argparse
-import concurrent.futures
+import asyncio
+import errno
+import functools
 import importlib.resources
 import logging
 import os
-import platform
+import resource
 import shutil
+import signal
 import socket
+import stat
 import subprocess
 import sys
 import tempfile
 import time
 from pathlib import Path
 
-import yaml
-
 from omnistat import utils
 
 
+@functools.lru_cache(maxsize=None)
+def findNumactl():
+    """Locate numactl binary (PATH lookup done once per process)"""
+    return shutil.which("numactl")
+
+
 class UserBasedMonitoring:
     def __init__(self):
         logging.basicConfig(format="%(message)s", level=logging.INFO, stream=sys.stdout)
@@ -102,18 +110,18 @@ class UserBasedMonitoring:
             logging.debug("Skipping VictoriaMetrics setup - already initialized")
             return
 
-        section = "omnistat.usermode"
+        usermodeConfig = self.runtimeConfig["omnistat.usermode"]
 
-        self.__external_victoria = self.runtimeConfig[section].getboolean("external_victoria", False)
+        self.__external_victoria = usermodeConfig.getboolean("external_victoria", False)
         if self.__external_victoria:
             logging.info("External VictoriaMetrics server requested")
-            self.__external_victoria_endpoint = self.runtimeConfig[section].get("external_victoria_endpoint")
-            self.__external_victoria_port = self.runtimeConfig[section].get("external_victoria_port")
+            self.__external_victoria_endpoint = usermodeConfig.get("external_victoria_endpoint")
+            self.__external_victoria_port = usermodeConfig.get("external_victoria_port")
             logging.info("--> external host = %s" % self.__external_victoria_endpoint)
             logging.info("--> external port = %s" % self.__external_victoria_port)
 
-            if self.runtimeConfig.has_option(section, "external_proxy"):
-                self.__external_proxy = self.runtimeConfig[section].get("external_proxy")
+            if "external_proxy" in usermodeConfig:
+                self.__external_proxy = usermodeConfig.get("external_proxy")
                 logging.info("--> external proxy = %s" % self.__external_proxy)
         else:
             logging.info("Local VictoriaMetrics server requested")
@@ -129,9 +137,10 @@ class UserBasedMonitoring:
         who have proxy settings in their runtime environment to access the outside world.
         """
 
-        os.environ.pop("http_proxy", None)
-        os.environ.pop("https_proxy", None)
-        os.environ.pop("all_proxy", None)
+        # only touch the process environment (unsetenv) for variables actually present
+        for proxy in ("http_proxy", "https_proxy", "all_proxy"):
+            if proxy in os.environ:
+                del os.environ[proxy]
 
         return
 
@@ -139,10 +148,27 @@ class UserBasedMonitoring:
         if self.__rms == "slurm":
             hostlist = os.getenv("SLURM_JOB_NODELIST", None)
             if hostlist:
+                # expand common nodelist forms in-process; defer to scontrol for anything more involved
+                hosts = utils.expandSlurmNodelist(hostlist)
+                if hosts:
+                    self.__hosts = hosts
+                    return
+
+                # reuse expansion cached by an earlier invocation within the same job (first line is the nodelist)
+                jobid = os.getenv("SLURM_JOB_ID")
+                cacheFile = None
+                if jobid:
+                    cacheFile = os.path.join(tempfile.gettempdir(), "omnistat_hosts_%i_%s" % (os.getuid(), jobid))
+                    hosts = self.readHostCache(cacheFile, hostlist)
+                    if hosts:
+                        self.__hosts = hosts
+                        return
+
                 results = utils.runShellCommand(["scontrol", "show", "hostname", hostlist], timeout=10)
                 if results.stdout.strip():
                     self.__hosts = results.stdout.splitlines()
-                    # return results.stdout.splitlines()
+                    if cacheFile:
+                        self.writeHostCache(cacheFile, hostlist)
                     return
                 else:
                     utils.error("Unable to detect assigned SLURM hosts from %s" % hostlist)
@@ -166,9 +192,46 @@ class UserBasedMonitoring:
         else:
             utils.error("Unsupported RMS.")
 
+    def readHostCache(self, cacheFile, hostlist):
+        """Read cached host expansion, trusting it only if owned by us and not writable by others
+
+        Returns:
+            list: cached hostnames, or None if the cache is missing, untrusted, or for another nodelist
+        """
+        try:
+            fd = os.open(cacheFile, os.O_RDONLY | os.O_NOFOLLOW)
+        except OSError:
+            return None
+        with os.fdopen(fd) as f:
+            info = os.fstat(f.fileno())
+            if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                logging.warning("Ignoring untrusted SLURM host cache %s" % cacheFile)
+                return None
+            cached = f.read().splitlines()
+        if len(cached) > 1 and cached[0] == hostlist:
+            logging.debug("Using cached SLURM host expansion from %s" % cacheFile)
+            return cached[1:]
+        return None
+
+    def writeHostCache(self, cacheFile, hostlist):
+        """Atomically cache host expansion (first line is the nodelist it was expanded from)"""
+        tmpName = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", dir=os.path.dirname(cacheFile), prefix=".omnistat_hosts", delete=False
+            ) as f:
+                tmpName = f.name
+                f.write(hostlist + "\n")
+                f.write("\n".join(self.__hosts) + "\n")
+            os.replace(tmpName, cacheFile)
+        except OSError as e:
+            logging.debug("Unable to cache SLURM host expansion: %s" % e)
+            if tmpName and os.path.exists(tmpName):
+                os.remove(tmpName)
+
     def startVictoriaServer(self):
 
-        section = "omnistat.usermode"
+        usermodeConfig = self.runtimeConfig["omnistat.usermode"]
 
         self.victoriaModeSetup()
 
@@ -179,8 +242,8 @@ class UserBasedMonitoring:
         else:
             logging.info("Starting VictoriaMetrics server on localhost")
 
-        vm_binary = self.runtimeConfig[section].get("victoria_binary")
-        vm_datadir = self.runtimeConfig[section].get("victoria_datadir", "data_prom", vars=os.environ)
+        vm_binary = usermodeConfig.get("victoria_binary")
+        vm_datadir = usermodeConfig.get("victoria_datadir", "data_prom", vars=os.environ)
 
         if not os.path.exists(vm_binary):
             logging.error("")
@@ -197,8 +260,8 @@ class UserBasedMonitoring:
                 "OMNISTAT_VICSERVER_DATADIR variable is being deprecated - please use OMNISTAT_VICTORIA_DATADIR instead"
             )
 
-        vm_logfile = self.runtimeConfig[section].get("victoria_logfile", "victoria_server.log")
-        vm_corebinding = self.runtimeConfig[section].getint("victoria_corebinding", None)
+        vm_logfile = usermodeConfig.get("victoria_logfile", "victoria_server.log")
+        vm_corebinding = usermodeConfig.getint("victoria_corebinding", None)
         # corebinding can also be overridden by separate env variable
         if "OMNISTAT_VICTORIA_COREBINDING" in os.environ:
             vm_corebinding = int(os.getenv("OMNISTAT_VICTORIA_COREBINDING"))
@@ -226,7 +289,8 @@ class UserBasedMonitoring:
             logging.info("Skipping VictoriaMetrics corebinding")
 
         logging.info("Server start command: %s" % command)
-        utils.runBGProcess(command, outputFile=vm_logfile, envAdds=envAddition)
+        server = utils.runBGProcess(command, outputFile=vm_logfile, envAdds=envAddition)
+        self.savePid(server, "victoria_server.pid")
 
     def startPromServer(self, victoriaMode=True):
 
@@ -248,41 +312,44 @@ class UserBasedMonitoring:
         else:
             scrape_timeout = scrape_interval
 
-        section = "omnistat.usermode"
-        ps_binary = self.runtimeConfig[section].get("prometheus_binary")
-        ps_datadir = self.runtimeConfig[section].get("prometheus_datadir", "data_prom", vars=os.environ)
+        usermodeConfig = self.runtimeConfig["omnistat.usermode"]
+        ps_binary = usermodeConfig.get("prometheus_binary")
+        ps_datadir = usermodeConfig.get("prometheus_datadir", "data_prom", vars=os.environ)
 
         # datadir can be overridden by separate env variable
         if "OMNISTAT_PROMSERVER_DATADIR" in os.environ:
             ps_datadir = os.getenv("OMNISTAT_PROMSERVER_DATADIR")
 
-        ps_logfile = self.runtimeConfig[section].get("prometheus_logfile", "prom_server.log")
-        ps_corebinding = self.runtimeConfig[section].getint("prometheus_corebinding", None)
+        ps_logfile = usermodeConfig.get("prometheus_logfile", "prom_server.log")
+        ps_corebinding = usermodeConfig.getint("prometheus_corebinding", None)
         # corebinding can also be overridden by separate env variable
         if "OMNISTAT_PROMSERVER_COREBINDING" in os.environ:
             ps_corebinding = int(os.getenv("OMNISTAT_PROMSERVER_COREBINDING"))
 
         # generate prometheus config file to scrape local exporters
-        computes = {}
-        computes["targets"] = []
         port = self.runtimeConfig["omnistat.collectors"].get("port", "8001")
         if self.__hosts:
-            for host in self.__hosts:
-                computes["targets"].append("%s:%s" % (host, port))
-
-            prom_config = {}
-            prom_config["scrape_configs"] = []
-            prom_config["scrape_configs"].append(
-                {
-                    "job_name": "omnistat",
-                    "scrape_interval": scrape_interval,
-                    "scrape_timeout": scrape_timeout,
-                    "static_configs": [computes],
-                }
+            # fixed config schema: emit YAML directly, one line per scrape target
+            prom_config = "".join(
+                [
+                    "scrape_configs:\n- job_name: omnistat\n",
+                    "  scrape_interval: %s\n  scrape_timeout: %s\n" % (scrape_interval, scrape_timeout),
+                    "  static_configs:\n  - targets:\n",
+                ]
+                + ["    - %s:%s\n" % (host, port) for host in self.__hosts]
             )
 
-            with open("prometheus.yml", "w") as yaml_file:
-                yaml.dump(prom_config, yaml_file, sort_keys=False)
+            # leave an identical config from a previous run untouched
+            try:
+                with open("prometheus.yml") as yaml_file:
+                    unchanged = yaml_file.read() == prom_config
+            except OSError:
+                unchanged = False
+            if unchanged:
+                logging.debug("Reusing existing prometheus.yml")
+            else:
+                with open("prometheus.yml", "w") as yaml_file:
+                    yaml_file.write(prom_config)
 
             command = [
                 ps_binary,
@@ -298,30 +365,66 @@ class UserBasedMonitoring:
                 logging.info("Skipping Prometheus corebinding")
 
             logging.debug("Server start command: %s" % command)
-            utils.runBGProcess(command, outputFile=ps_logfile)
+            server = utils.runBGProcess(command, outputFile=ps_logfile)
+            self.savePid(server, "prom_server.pid")
         else:
             utils.error("No compute hosts avail for startPromServer")
 
+    def savePid(self, process, pidFile):
+        """Record pid of a background server so it can be stopped without scanning the process table"""
+        try:
+            with open(pidFile, "w") as f:
+                f.write("%i\n" % process.pid)
+        except OSError as e:
+            logging.debug("Unable to save server pid to %s: %s" % (pidFile, e))
+
+    def stopFromPidFile(self, pidFile, expected):
+        """Send SIGTERM to the server recorded in pidFile
+
+        Args:
+            pidFile (str): file written by savePid
+            expected (bytes): string that must appear in the process command line (guards against pid reuse)
+
+        Returns:
+            bool: True if the server was signaled
+        """
+        try:
+            with open(pidFile) as f:
+                pid = int(f.read())
+            os.remove(pidFile)
+            with open("/proc/%i/cmdline" % pid, "rb") as f:
+                if expected not in f.read():
+                    return False
+            os.kill(pid, signal.SIGTERM)
+        except (OSError, ValueError):
+            return False
+        return True
+
     def stopPromServer(self, victoriaMode=False):
         if victoriaMode:
             logging.info("Stopping VictoriaMetrics server on localhost")
 
-            command = ["pkill", "-f", "-SIGTERM", "-u", "%s" % os.getuid(), "victoria-metrics.*storageDataPath"]
-            utils.runShellCommand(command, timeout=5)
+            # fall back to a process table scan if the server was started elsewhere
+            if not self.stopFromPidFile("victoria_server.pid", b"storageDataPath"):
+                command = ["pkill", "-f", "-SIGTERM", "-u", "%s" % os.getuid(), "victoria-metrics.*storageDataPath"]
+                utils.runShellCommand(command, timeout=5)
             time.sleep(1)
             return
         else:
             logging.info("Stopping prometheus server on localhost")
 
-            command = ["pkill", "-SIGTERM", "-u", "%s" % os.getuid(), "prometheus"]
-
-            utils.runShellCommand(command, timeout=5)
+            if not self.stopFromPidFile("prom_server.pid", b"prometheus"):
+                command = ["pkill", "-SIGTERM", "-u", "%s" % os.getuid(), "prometheus"]
+                utils.runShellCommand(command, timeout=5)
             time.sleep(1)
             return
 
     def startExporters(self, victoriaMode=False):
         port = self.runtimeConfig["omnistat.collectors"].get("port", "8001")
-        corebinding = self.runtimeConfig["omnistat.usermode"].getint("exporter_corebinding", None)
+        usermodeConfig = self.runtimeConfig["omnistat.usermode"]
+        corebinding = usermodeConfig.getint("exporter_corebinding", None)
+        # number of concurrent ssh sessions used to launch exporters (raise for large allocations)
+        sshConcurrency = usermodeConfig.getint("exporter_ssh_concurrency", 128)
 
         self.rmsDetection()
         self.disableProxies()
@@ -331,7 +434,7 @@ class UserBasedMonitoring:
             if os.path.exists("./exporter.log"):
                 os.remove("./exporter.log")
             logging.info("[exporter]: Standalone sampling interval = %s" % self.scrape_interval)
-            hostname = platform.node().split(".", 1)[0]
+            hostname = utils.getShortHostname()
 
             if self.__external_victoria:
                 cmd = f"nice -n 20 {sys.executable} -m omnistat.standalone --configfile={self.configFile} --interval {self.scrape_interval} --pushinterval {self.push_frequency} --endpoint {self.__external_victoria_endpoint} --port {self.__external_victoria_port} --log exporter.log"
@@ -362,6 +465,8 @@ class UserBasedMonitoring:
             detection_file = self.runtimeConfig["omnistat.collectors.rms"].get(
                 "job_detection_file", "/tmp/omni_rmsjobinfo"
             )
+            # remote commands run from the same working dir and module search path as this process
+            remote_prefix = f"cd {os.getcwd()} && PYTHONPATH={':'.join(sys.path)}"
             if self.__rms == "slurm":
                 numNodes = os.getenv("SLURM_JOB_NUM_NODES")
                 srun_cmd = [
@@ -395,9 +500,9 @@ class UserBasedMonitoring:
                 )
 
                 results = utils.execute_ssh_parallel(
-                    command=f"sh -c 'cd {os.getcwd()} && PYTHONPATH={':'.join(sys.path)} {pbs_vars} {sys.executable} {self.binDir}/omnistat-rms-env --nostep {detection_file}'",
+                    command=f"sh -c '{remote_prefix} {pbs_vars} {sys.executable} {self.binDir}/omnistat-rms-env --nostep {detection_file}'",
                     hostnames=self.__hosts,
-                    max_concurrent=128,
+                    max_concurrent=sshConcurrency,
                     ssh_timeout=15,
                     max_retries=2,
                     retry_delay=5,
@@ -412,56 +517,39 @@ class UserBasedMonitoring:
 
             # trying local ssh client implementation
             launch_results = utils.execute_ssh_parallel(
-                command=f"sh -c 'cd {os.getcwd()} && PYTHONPATH={':'.join(sys.path)} {additional_env} {cmd}'",
+                command=f"sh -c '{remote_prefix} {additional_env} {cmd}'",
                 hostnames=self.__hosts,
-                max_concurrent=128,
+                max_concurrent=sshConcurrency,
                 ssh_timeout=100,
                 max_retries=3,
                 retry_delay=5,
             )
 
-            # verify exporter available on all nodes...
-            if len(self.__hosts) <= 8:
-                psecs = 5
-            elif len(self.__hosts) <= 128:
-                psecs = 30
+            # verify exporter available on all nodes: probe immediately and keep retrying until the
+            # readiness budget expires (larger allocations allow for slow SLURM query times on ORNL)
+            numHosts = len(self.__hosts)
+            if numHosts <= 8:
+                readiness_timeout = 25
+            elif numHosts <= 128:
+                readiness_timeout = 50
             else:
-                psecs = 90
+                readiness_timeout = 110
 
-            logging.info("Exporters launched, pausing for %i secs" % psecs)
-            time.sleep(psecs)  # <-- needed for slow SLURM query times on ORNL
-            numHosts = len(self.__hosts)
             numAvail = 0
 
             if True:
                 logging.info("Testing exporter availability")
-                delay_start = 0.05
+                # probe hosts concurrently: total wait is bounded by the slowest host rather than the sum
+                results = asyncio.run(self.probeExporters(self.__hosts, int(port), readiness_timeout))
                 hosts_ok = []
                 hosts_bad = []
-                for host in self.__hosts:
-                    host_ok = False
-                    for iter in range(1, 25):
-                        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                            try:
-                                result = s.connect_ex((host, int(port)))
-
-                                if result == 0:
-                                    numAvail = numAvail + 1
-                                    hosts_ok.append(host)
-                                    logging.debug("Exporter on %s ok" % host)
-                                    host_ok = True
-                                    break
-                                else:
-                                    delay = delay_start * iter
-                                    logging.debug("Retrying %s (sleeping for %.2f sec)" % (host, delay))
-                                    time.sleep(delay)
-                                s.close()
-                            except Exception as e:
-                                break
-
-                    if not host_ok:
+                for host, host_ok, result in results:
+                    if host_ok:
+                        hosts_ok.append(host)
+                    else:
                         logging.error("Missing exporter on %s (%s)" % (host, result))
                         hosts_bad.append(host)
+                numAvail = len(hosts_ok)
 
                 logging.info("%i of %i exporters available" % (numAvail, numHosts))
                 if numAvail == numHosts:
@@ -480,15 +568,107 @@ class UserBasedMonitoring:
 
         return
 
-    def stopSingleExporters(self, host, port, timeout=120):
-        logging.debug("Stopping exporter for host -> %s" % host)
-        cmd = ["curl", f"{host}:{port}/shutdown"]
-        logging.debug("-> running command: %s" % cmd)
-        t1 = time.perf_counter()
-        utils.runShellCommand(cmd, timeout=timeout)
-        t2 = time.perf_counter()
+    async def probeExporter(self, host, port, timeout, limiter):
+        """Check exporter availability on a single host, retrying while the exporter starts up
+
+        Args:
+            timeout (float): overall time allowed for the exporter to become reachable (secs)
+            limiter (asyncio.Semaphore): bounds concurrent connections across hosts
 
-        return t2 - t1
+        Returns:
+            tuple: (host, availability flag, last connection result)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay_start = 0.05
+        delay_max = 1.0
+        result = None
+        iter = 0
+
+        # resolve once up front; retries connect to the address directly
+        try:
+            addrinfo = await loop.getaddrinfo(host, port, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            # unresolvable host: retrying will not help
+            return host, False, e.errno
+        address = addrinfo[0][4][0]
+
+        while True:
+            # wait for a connection slot outside of the attempt timeout: time spent queued behind
+            # other hosts is not a failure of this host
+            async with limiter:
+                try:
+                    # bound each attempt so unresponsive hosts fail fast
+                    attempt_timeout = min(2.0, max(deadline - loop.time(), 0.25))
+                    # a listening socket alone does not mean the exporter finished initializing (gunicorn
+                    # binds before its worker is ready): require an HTTP response, with any status accepted
+                    # since the probing host may not be in the exporter's allowed IPs. Request an unrouted
+                    # path so neither this probe nor a stale one left in the listen backlog triggers a
+                    # full metrics collection.
+                    status = await asyncio.wait_for(self.requestStatusLine(host, address, port, "/"), attempt_timeout)
+                    if status.startswith(b"HTTP/"):
+                        logging.debug("Exporter on %s ok (%s)", host, status.decode(errors="replace").rstrip())
+                        return host, True, 0
+                    result = errno.EPROTO
+                except asyncio.TimeoutError:
+                    result = errno.ETIMEDOUT
+                except OSError as e:
+                    result = e.errno
+
+            # exponential backoff between retries
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            delay = min(delay_max, delay_start * 2**iter, remaining)
+            iter += 1
+            logging.debug("Retrying %s (sleeping for %.2f sec)", host, delay)
+            await asyncio.sleep(delay)
+
+        return host, False, result
+
+    async def requestStatusLine(self, host, address, port, path):
+        """Issue a minimal HTTP GET to an exporter and return the response status line"""
+        reader, writer = await asyncio.open_connection(address, port)
+        try:
+            writer.write(b"GET %s HTTP/1.0\r\nHost: %s:%d\r\n\r\n" % (path.encode(), host.encode(), port))
+            await writer.drain()
+            return await reader.readline()
+        finally:
+            writer.close()
+
+    def newConnectionLimit(self, numHosts):
+        """Bound concurrent exporter connections by job size and the open file limit
+
+        Must be called from within the event loop that uses the returned semaphore.
+        """
+        softLimit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if softLimit == resource.RLIM_INFINITY:
+            softLimit = 2048
+        return asyncio.Semaphore(max(8, min(numHosts, 1024, softLimit // 2)))
+
+    async def probeExporters(self, hosts, port, timeout):
+        """Check exporter availability on all hosts concurrently within a single event loop"""
+        limiter = self.newConnectionLimit(len(hosts))
+        return await asyncio.gather(*(self.probeExporter(host, port, timeout, limiter) for host in hosts))
+
+    async def stopSingleExporter(self, host, port, limiter, timeout=120):
+        # acquire a connection slot before starting the clock so queueing is not charged to this host
+        async with limiter:
+            logging.debug("Stopping exporter for host -> %s", host)
+            t1 = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.requestStatusLine(host, host, port, "/shutdown"), timeout)
+            except (asyncio.TimeoutError, OSError) as e:
+                # exporter may terminate before completing the response
+                logging.debug("-> shutdown request to %s ended with: %r", host, e)
+            t2 = time.perf_counter()
+
+        return host, t2 - t1
+
+    async def stopAllExporters(self, hosts, port):
+        """Send shutdown requests to all hosts concurrently within a single event loop"""
+        limiter = self.newConnectionLimit(len(hosts))
+        return await asyncio.gather(*(self.stopSingleExporter(host, port, limiter) for host in hosts))
 
     def stopExporters(self, victoriaMode=False):
         self.rmsDetection()
@@ -498,28 +678,19 @@ class UserBasedMonitoring:
 
         port = self.runtimeConfig["omnistat.collectors"].get("port", "8001")
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=256) as executor:
-            future_to_host = {
-                executor.submit(
-                    self.stopSingleExporters,
-                    host,
-                    port,
-                ): host
-                for host in self.__hosts
-            }
-
-        # Collect results as they complete
+        # issue shutdown requests in-process from one event loop (no per-host process or thread)
+        results = asyncio.run(self.stopAllExporters(self.__hosts, int(port)))
+        logging.info("Stop signal dispatched to %i hosts" % len(results))
+
         min_time = float("inf")
         max_time = float("-inf")
         avg_time = 0.0
         count = 0
 
-        for future in concurrent.futures.as_completed(future_to_host):
-            host = future_to_host[future]
-            timing = future.result()
+        for host, timing in results:
             avg_time += timing
             count += 1
-            logging.debug("--> %s required %.2f secs to shutdown" % (host, timing))
+            logging.debug("--> %s required %.2f secs to shutdown", host, timing)
             if timing < min_time:
                 min_time = timing
             if timing > max_time:
@@ -541,24 +712,21 @@ class UserBasedMonitoring:
             list: numactl command
         """
 
-        numactl = shutil.which("numactl")
+        numactl = findNumactl()
         if not numactl:
             return None
 
         if not isinstance(coreid, int):
             return None
 
-        # we have numactl and a core provided - verify we can use it locally
-        numa_command = ["numactl", f"--physcpubind={coreid}"]
-
-        results = utils.runShellCommand(numa_command + ["hostname"], timeout=2)
-        if results.returncode != 0:
+        # we have numactl and a core provided - verify the core is in our allowed cpuset (numactl
+        # rejects binding outside of it) without spawning a trial numactl process
+        if coreid not in os.sched_getaffinity(0):
             logging.warning("Unable to use numactl with supplied cpu core = %i" % coreid)
-            logging.debug("--> " + results.stdout.splitlines()[0])
-            logging.debug("--> " + results.stderr.splitlines()[0])
+            logging.debug("--> allowed cpus = %s" % sorted(os.sched_getaffinity(0)))
             return None
-        else:
-            return numa_command
+
+        return ["numactl", f"--physcpubind={coreid}"]
 
 
 def main():
@@ -31,7 +31,6 @@ import argparse
 import ctypes
 import logging
 import os
-import platform
 import pwd
 import signal
 import sys
@@ -105,7 +104,7 @@ class Standalone:
     def __init__(self, args, config):
         logging.basicConfig(format="%(message)s", level=logging.ERROR, stream=sys.stdout, flush=True)
         self.__dataVM = []
-        self.__hostname = platform.node().split(".", 1)[0]
+        self.__hostname = utils.getShortHostname()
         self.__instanceLabel = 'instance="%s"' % self.__hostname
 
         if args.interval < 0.005:
@@ -420,15 +419,16 @@ def main():
 
     caching = Standalone(args, config)
 
-    # Enforce network restrictions
-    @app.before_request
+    # Enforce network restrictions (allowed set bound once; no hook needed when all IPs are allowed)
+    allowedIPs = monitor.runtimeConfig["collector_allowed_ips"]
+
     def restrict_ips():
-        allowed_ips = config["omnistat.collectors"].get("allowed_ips", "127.0.0.1")
-        if "0.0.0.0" in allowed_ips:
-            return
-        elif request.remote_addr not in allowed_ips:
+        if request.remote_addr not in allowedIPs:
             abort(403)
 
+    if not monitor.runtimeConfig["collector_allow_all_ips"]:
+        app.before_request(restrict_ips)
+
     # Launch flask app as separate thread so we can respond to remote shutdown requests
     flask_thread = threading.Thread(target=runFlask, args=[config])
     flask_thread.start()
@@ -25,9 +25,11 @@
 import argparse
 import concurrent.futures
 import configparser
+import functools
 import importlib.resources
 import logging
 import os
+import platform
 import re
 import resource
 import shutil
@@ -37,6 +39,9 @@ import time
 from importlib.metadata import version
 from pathlib import Path
 
+# one SLURM nodelist entry: hostname prefix with optional bracketed index ranges (e.g. node[01-04,07])
+NODELIST_ENTRY = re.compile(r"([^,\[\]]+)(?:\[([\d,\-]+)\])?(?:,|$)")
+
 
 def convert_bdf_to_gpuid(bdf_string):
     """
@@ -335,14 +340,16 @@ def runShellCommand(command, capture_output=True, text=True, exit_on_error=False
 
 def runBGProcess(command, outputFile=".bgcommand.output", mode="w", envAdds=None):
     logging.debug("Command to run in background = %s" % command)
-    env = os.environ.copy()
 
+    # inherit environment directly unless additions are requested
+    env = None
     if envAdds:
-        for entry in envAdds:
-            env[entry] = envAdds[entry]
+        env = os.environ.copy()
+        env.update(envAdds)
 
-    outfile = open(outputFile, mode)
-    results = subprocess.Popen(command, stdout=outfile, stderr=outfile, env=env)
+    # child keeps its own copy of the output descriptor; no need to hold it open here
+    with open(outputFile, mode) as outfile:
+        results = subprocess.Popen(command, stdout=outfile, stderr=outfile, env=env)
     return results
 
 
@@ -391,6 +398,47 @@ def removeQuotes(input):
     return input
 
 
+def expandSlurmNodelist(hostlist):
+    """Expand a SLURM nodelist expression into individual hostnames
+
+    Handles comma-separated entries with at most one bracketed range group each
+    (e.g. "node[01-03,07],login1"); zero padding follows the width of each range start.
+
+    Args:
+        hostlist (str): compressed SLURM nodelist
+
+    Returns:
+        list: expanded hostnames, or None if the expression uses unsupported syntax
+    """
+    hosts = []
+    pos = 0
+    while pos < len(hostlist):
+        match = NODELIST_ENTRY.match(hostlist, pos)
+        if not match:
+            return None
+        prefix, ranges = match.groups()
+        if ranges is None:
+            hosts.append(prefix)
+        else:
+            for entry in ranges.split(","):
+                start, dash, end = entry.partition("-")
+                if not start or (dash and not end) or "-" in end:
+                    return None
+                first, last = int(start), int(end or start)
+                if last < first:
+                    return None
+                width = len(start)
+                hosts.extend(prefix + str(index).zfill(width) for index in range(first, last + 1))
+        pos = match.end()
+    return hosts or None
+
+
+@functools.lru_cache(maxsize=None)
+def getShortHostname():
+    """Return local hostname without domain (resolved once per process)"""
+    return platform.node().split(".", 1)[0]
+
+
 def getMemoryUsageMB():
     """Get current process memory usage in MB"""
     return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
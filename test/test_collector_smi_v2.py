@@ -0,0 +1,69 @@
+import enum
+import importlib
+import sys
+import types
+
+import pytest
+from prometheus_client import REGISTRY
+
+GPU_METRICS = {
+    "average_gfx_activity": 10,
+    "average_umc_activity": 5,
+    "average_gfxclk_frequency": 1500,
+    "current_gfxclk": 1400,
+    "average_socket_power": 300,
+    "current_socket_power": 310,
+    "average_uclk_frequency": "N/A",
+    "current_uclk": 900,
+    "temperature_edge": 40,
+}
+
+
+def amdsmiStub():
+    """Minimal amdsmi module exposing a single GPU"""
+    smi = types.ModuleType("amdsmi")
+
+    class AmdSmiException(Exception):
+        pass
+
+    smi.AmdSmiException = AmdSmiException
+    smi.AmdSmiMemoryType = enum.IntEnum("AmdSmiMemoryType", {"VRAM": 0})
+    smi.AmdSmiTemperatureMetric = enum.IntEnum("AmdSmiTemperatureMetric", {"CURRENT": 0})
+    smi.AmdSmiTemperatureType = enum.IntEnum("AmdSmiTemperatureType", {"EDGE": 0})
+    smi.amdsmi_init = lambda: None
+    smi.amdsmi_get_lib_version = lambda: {"year": 25, "major": 1, "minor": 0, "release": 0}
+    smi.amdsmi_get_processor_handles = lambda: ["gpu0"]
+    smi.amdsmi_get_gpu_kfd_info = lambda device: {"kfd_id": 1, "node_id": 1}
+    smi.amdsmi_get_gpu_vbios_info = lambda device: {"part_number": "vbios"}
+    smi.amdsmi_get_gpu_asic_info = lambda device: {"market_name": "stub"}
+    smi.amdsmi_get_gpu_driver_info = lambda device: {"driver_version": "1.0"}
+    smi.amdsmi_get_gpu_memory_total = lambda device, memType: 1000
+    smi.amdsmi_get_gpu_memory_usage = lambda device, memType: 100
+    smi.amdsmi_get_temp_metric = lambda device, location, metric: 40
+    smi.amdsmi_get_gpu_metrics_info = lambda device: dict(GPU_METRICS)
+    return smi
+
+
+@pytest.fixture
+def collector_smi_v2(monkeypatch):
+    monkeypatch.setitem(sys.modules, "amdsmi", amdsmiStub())
+    monkeypatch.delitem(sys.modules, "omnistat.collector_smi_v2", raising=False)
+    return importlib.import_module("omnistat.collector_smi_v2")
+
+
+class TestAMDSMIMetricMapping:
+    def test_fallback_key_replaces_default(self, collector_smi_v2):
+        runtimeConfig = {
+            "collector_ras_ecc": False,
+            "collector_power_capping": False,
+            "collector_power_cap_dynamic": False,
+            "collector_cu_occupancy": False,
+            "collector_smi_min_sample_interval_ms": 0,
+        }
+        collector = collector_smi_v2.AMDSMI(runtimeConfig)
+        collector.registerMetrics()
+        collector.updateMetrics()
+
+        # average_uclk_frequency is "N/A": memory clock is read from current_uclk only
+        assert REGISTRY.get_sample_value("rocm_mclk_clock_mhz", {"card": "0", "source": "current_uclk"}) == 900
+        assert REGISTRY.get_sample_value("rocm_utilization_percentage", {"card": "0"}) == 10
@@ -0,0 +1,39 @@
+import pytest
+
+from omnistat.utils import expandSlurmNodelist
+
+
+class TestExpandSlurmNodelist:
+    @pytest.mark.parametrize(
+        "hostlist, expected",
+        [
+            ("node042", ["node042"]),
+            ("login1,login2", ["login1", "login2"]),
+            ("nid[8-10]", ["nid8", "nid9", "nid10"]),
+            ("node[01-03]", ["node01", "node02", "node03"]),
+            ("node[098-101]", ["node098", "node099", "node100", "node101"]),
+            ("node[001]", ["node001"]),
+            ("node[01-02,07],login1", ["node01", "node02", "node07", "login1"]),
+            ("x-y[9-10],z", ["x-y9", "x-y10", "z"]),
+        ],
+    )
+    def test_expand(self, hostlist, expected):
+        assert expandSlurmNodelist(hostlist) == expected
+
+    @pytest.mark.parametrize(
+        "hostlist",
+        [
+            "",
+            "[1-2]",
+            "node[1-]",
+            "node[-2]",
+            "node[1-2-3]",
+            "node[3-1]",
+            "node[1-2]x",
+            "rack[1-2]-node[1-2]",
+            "node[a-b]",
+            "node[1-2",
+        ],
+    )
+    def test_unsupported_returns_none(self, hostlist):
+        assert expandSlurmNodelist(hostlist) is None